@@ -113,19 +113,24 @@ class App(tk.Tk):
         self._messages.put(msg)
 
     def _poll_messages(self) -> None:
+        # Drena todos los mensajes pendientes y actualiza la UI una sola vez por tick
+        # (un insert en el log en vez de uno por mensaje).
+        batch: list[str] = []
         try:
             while True:
-                msg = self._messages.get_nowait()
-                self.status_var.set(msg)
-                try:
-                    self.log.configure(state=tk.NORMAL)
-                    self.log.insert(tk.END, msg + "\n")
-                    self.log.see(tk.END)
-                    self.log.configure(state=tk.DISABLED)
-                except Exception:
-                    pass
+                batch.append(self._messages.get_nowait())
         except queue.Empty:
             pass
+
+        if batch:
+            self.status_var.set(batch[-1])
+            try:
+                self.log.configure(state=tk.NORMAL)
+                self.log.insert(tk.END, "\n".join(batch) + "\n")
+                self.log.see(tk.END)
+                self.log.configure(state=tk.DISABLED)
+            except Exception:
+                pass
         self.after(200, self._poll_messages)
 
     def _on_open(self) -> None:
@@ -10,15 +10,19 @@ from typing import Dict, List, Tuple
 from openpyxl.reader.excel import load_workbook
 
 
+_WS_RE = re.compile(r"\s+")
+_DIGITS_RE = re.compile(r"\d+")
+
+
 def _norm_header(s: str) -> str:
     s = (s or "").strip().lower()
     s = "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
-    s = re.sub(r"\s+", " ", s)
+    s = _WS_RE.sub(" ", s)
     return s
 
 
 def _digits(s: str) -> str:
-    matches = re.findall(r"\d+", (s or ""))
+    matches = _DIGITS_RE.findall(s or "")
     if not matches:
         return ""
     # Usa el grupo de dígitos más largo para evitar casos tipo "1.23E+05" donde el primer match sería "1".
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import time
+from typing import Protocol
+
+
+class LocatorScope(Protocol):
+    def locator(self, selector: str):  # playwright's Locator
+        ...
+
+
+class BackoffSleeper:
+    """Espera con backoff exponencial (start .. cap) para loops de polling, sin pasarse del deadline.
+
+    Las esperas rápidas (<100 ms) se resuelven en 1-2 vueltas en vez de un tick fijo de 250 ms.
+    """
+
+    def __init__(self, timeout_s: float, start: float = 0.02, cap: float = 0.25) -> None:
+        self._deadline = time.monotonic() + timeout_s
+        self._delay = start
+        self._cap = cap
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self._deadline
+
+    def sleep(self) -> bool:
+        """Duerme el siguiente intervalo (recortado al deadline). False si ya venció."""
+        remaining = self._deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(self._delay, remaining))
+        self._delay = min(self._cap, self._delay * 2)
+        return True
+
+
+def scope_frame(scope: LocatorScope):
+    """Devuelve el Page/Frame donde vive el scope (un FrameLocator no expone evaluate/wait_for_function)."""
+    if hasattr(scope, "wait_for_function"):
+        return scope
+    return scope.locator("css=html").first.element_handle().owner_frame()
+
+
+# Texto (espacios normalizados) de la primera fila del tbody; "" si no hay filas. Recibe la lista
+# de filas (evaluate_all sobre "tbody tr"); FIRST_ROW_OF_SEL_JS la reutiliza como expresión.
+FIRST_ROW_TEXT_JS = "rows => rows.length ? (rows[0].innerText || '').replace(/\\s+/g, ' ').trim() : ''"
+
+# Expresión JS: texto de la primera fila de la tabla `sel` (variable del predicado que la usa).
+FIRST_ROW_OF_SEL_JS = (
+    "(" + FIRST_ROW_TEXT_JS + ")"
+    "(Array.from((document.querySelector(sel) || document.createElement('table')).querySelectorAll('tbody tr')))"
+)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import os
 import re
 import json
@@ -7,17 +8,19 @@ import shutil
 import threading
 import time
 import zipfile
+from collections import namedtuple
 from datetime import date, datetime
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
-from typing import Callable, Any, Protocol
+from typing import Callable, Any, Protocol, Sequence
 import unicodedata
 
-from playwright.sync_api import sync_playwright, Page
+from playwright.sync_api import sync_playwright, Frame, Page
 
 from openpyxl import Workbook
 from openpyxl.reader.excel import load_workbook
 
+from .playwright_helpers import FIRST_ROW_OF_SEL_JS, FIRST_ROW_TEXT_JS, BackoffSleeper, scope_frame
 from .table_extract import extract_table_to_csv, extract_tickets_to_excel, extract_customers_to_excel
 from .excel_merge import merge_tickets_customers
 
@@ -30,6 +33,114 @@ class LocatorScope(Protocol):
         ...
 
 
+# Paso de navegación ya normalizado: los candidatos "a||b||c" se separan una sola vez.
+_NormStep = namedtuple("_NormStep", "action selectors text key timeout_ms same_element", defaults=(False,))
+
+_STEP_DEFAULT_TIMEOUT_MS = {
+    "wait_enabled": 120_000,
+    "wait_nonempty": 300_000,  # 5 minutos por defecto
+}
+
+
+def _split_candidates(selector: Any) -> tuple[str, ...]:
+    if isinstance(selector, str):
+        return tuple(s.strip() for s in selector.split("||") if s.strip())
+    return tuple(str(s).strip() for s in selector if str(s).strip())
+
+
+def _normalize_steps(raw: Sequence[Any]) -> tuple[_NormStep, ...]:
+    """Convierte los steps de config a registros _NormStep.
+
+    Backward compatible:
+    - string => click
+    - {"action": "click", "selector": "..."}
+    - {"action": "fill", "selector": "...", "text": "..."}
+    - "same_element": true (opcional) indica que los candidatos "a||b" son el MISMO elemento;
+      sin él se prueban en orden de prioridad.
+    Los steps sin selector se descartan (antes eran no-op).
+    """
+    out: list[_NormStep] = []
+    for step in raw or ():
+        if isinstance(step, str):
+            action = "click"
+            candidates = _split_candidates(step)
+            text, key, timeout_ms, same_element = "", "", 0, False
+        elif isinstance(step, dict):
+            action = str(step.get("action", "click")).lower()
+            selector = step.get("selector")
+            candidates = _split_candidates(selector) if selector else ()
+            text = str(step.get("text", ""))
+            key = str(step.get("key", "Enter"))
+            timeout_ms = int(step.get("timeout_ms", _STEP_DEFAULT_TIMEOUT_MS.get(action, 0)))
+            same_element = bool(step.get("same_element", False))
+        else:
+            continue
+
+        if candidates:
+            out.append(_NormStep(action, candidates, text, key, timeout_ms, same_element))
+    return tuple(out)
+
+
+def _merge_selector_candidates(selectors: Sequence[str]) -> list[str]:
+    """Agrupa candidatos por engine: todos los css= en una lista CSS y los xpath= en una unión.
+
+    El resto de engines (text=, etc.) se mantiene tal cual, al final.
+    """
+    css = [s[len("css="):] for s in selectors if s.startswith("css=")]
+    xpaths = [s[len("xpath="):] for s in selectors if s.startswith("xpath=")]
+    others = [s for s in selectors if not s.startswith(("css=", "xpath="))]
+
+    merged: list[str] = []
+    if css:
+        merged.append("css=" + ", ".join(css))
+    if len(xpaths) == 1:
+        merged.append("xpath=" + xpaths[0])
+    elif xpaths:
+        merged.append("xpath=(" + " | ".join(xpaths) + ")")
+    merged.extend(others)
+    return merged
+
+
+# Pseudo-clases/combinadores CSS que solo existen en Playwright (no sirven en querySelector).
+_PW_ONLY_CSS_RE = re.compile(
+    r":(?:has-text|text|text-is|text-matches|visible|nth-match|left-of|right-of|above|below|near)\b|>>"
+)
+
+
+def _dom_queries(selectors: Sequence[str]) -> list[tuple[str, str]] | None:
+    """Traduce candidatos css=/xpath= a consultas DOM nativas; None si alguno no es traducible."""
+    out: list[tuple[str, str]] = []
+    for sel in selectors:
+        if sel.startswith("css=") and not _PW_ONLY_CSS_RE.search(sel):
+            out.append(("css", sel[len("css="):]))
+        elif sel.startswith("xpath="):
+            out.append(("xpath", sel[len("xpath="):]))
+        else:
+            return None
+    return out
+
+
+# Espera del intento unido de _collapse_css_candidates: si no aparece rápido, sigue el orden normal.
+_MERGED_ATTEMPT_TIMEOUT_MS = 3_000
+
+
+def _collapse_css_candidates(
+    selectors: Sequence[str], same_element: bool = False
+) -> list[tuple[str, float | None]]:
+    """Intentos (selector, timeout de visibilidad) para _click_any/_fill_any/_press_any.
+
+    Por defecto la lista tal cual con el timeout de la page: el orden es la prioridad (p.ej. preferir
+    la opción resaltada antes que 'Cualquiera'). Solo si el step lo pide explícitamente
+    ("same_element": true, los candidatos son el MISMO elemento) y todos son CSS, se antepone un
+    único selector unido y filtrado a visibles, con una espera corta; si falla, se sigue en orden.
+    """
+    attempts: list[tuple[str, float | None]] = [(s, None) for s in selectors]
+    if same_element and len(selectors) > 1 and all(s.startswith("css=") for s in selectors):
+        merged = _merge_selector_candidates(selectors)[0] + " >> visible=true"
+        attempts.insert(0, (merged, _MERGED_ATTEMPT_TIMEOUT_MS))
+    return attempts
+
+
 @dataclass(frozen=True)
 class SplynxConfig:
     login_url: str
@@ -37,6 +148,105 @@ class SplynxConfig:
     tables: dict[str, dict[str, Any]]
     browser: dict[str, Any]
 
+    @functools.cached_property
+    def table_steps(self) -> dict[str, tuple[_NormStep, ...]]:
+        """Steps de cada tabla, normalizados una vez por config."""
+        return {key: _normalize_steps(cfg.get("steps") or ()) for key, cfg in self.tables.items()}
+
+
+@functools.lru_cache(maxsize=128)
+def _render_date_macros(day_ordinal: int, text: str) -> str:
+    # El ordinal del día forma parte de la llave: el cache se invalida solo al cambiar de fecha.
+    today = date.fromordinal(day_ordinal)
+    month_start = today.replace(day=1)
+
+    rendered = text
+    rendered = rendered.replace("{today:%d/%m/%Y}", today.strftime("%d/%m/%Y"))
+    rendered = rendered.replace("{month_start:%d/%m/%Y}", month_start.strftime("%d/%m/%Y"))
+    return rendered
+
+
+# Steps por defecto, normalizados una sola vez al importar el módulo.
+
+# Tabla 1 (manual): el bot solo navega hasta Tickets -> List (y ajusta Acceso rápido).
+_TABLE1_MANUAL_NAV_STEPS = _normalize_steps([
+    # Tickets
+    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(4) > div > a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[4]/div/a",
+    # List
+    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(4) > div > div > div:nth-child(2) > div > a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[4]/div/div/div[2]/div/a",
+    # Acceso rápido
+    "css=#select2-admin_support_tickets_opened_filter_quick_access-container||xpath=//*[@id='select2-admin_support_tickets_opened_filter_quick_access-container']",
+    "css=li[id^='select2-admin_support_tickets_opened_filter_quick_access-result-']:has-text('All tickets')||xpath=//li[starts-with(@id,'select2-admin_support_tickets_opened_filter_quick_access-result-')][contains(.,'All tickets')]||text=All tickets||xpath=/html/body/span/span/span[2]/ul/li[4]",
+])
+
+# Tabla 1: Tickets -> List + filtros nuevos
+_TABLE1_DEFAULT_STEPS = _normalize_steps([
+    # Tickets
+    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(4) > div > a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[4]/div/a",
+    # List
+    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(4) > div > div > div:nth-child(2) > div > a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[4]/div/div/div[2]/div/a",
+    # Quick access dropdown (Acceso Rápido)
+    "css=#select2-admin_support_tickets_opened_filter_quick_access-container||xpath=//*[@id='select2-admin_support_tickets_opened_filter_quick_access-container']",
+    # All tickets option (id suele cambiar; preferimos texto/xpath)
+    "css=li[id^='select2-admin_support_tickets_opened_filter_quick_access-result-']:has-text('All tickets')||xpath=//li[starts-with(@id,'select2-admin_support_tickets_opened_filter_quick_access-result-')][contains(.,'All tickets')]||text=All tickets||xpath=/html/body/span/span/span[2]/ul/li[4]",
+    # Filter button
+    "css=#content > div > div.splynx-top-nav > div.filters-nav > div > div:nth-child(6) > button||xpath=//*[@id='content']/div/div[1]/div[2]/div/div[6]/button||xpath=/html/body/div[2]/div[3]/div[1]/div/div/div[1]/div[2]/div/div[6]/button||text=Filter",
+
+    # Condition
+    "css=#select2-admin_support_tickets_opened_search_widget_condition-container||xpath=//*[@id='select2-admin_support_tickets_opened_search_widget_condition-container']",
+    # All option (id dinámico)
+    "css=li[id^='select2-admin_support_tickets_opened_search_widget_condition-result-']:has-text('All')||css=li[id^='select2-admin_support_tickets_opened_search_widget_condition-result-']:has-text('Todos')||xpath=//li[starts-with(@id,'select2-admin_support_tickets_opened_search_widget_condition-result-')][contains(.,'All') or contains(.,'Todos')]||xpath=/html/body/span/span/span[2]/ul/li[3]||text=All||text=Todos",
+
+    # Group
+    "css=#select2-admin_support_tickets_opened_search_widget_group_id-container||xpath=//*[@id='select2-admin_support_tickets_opened_search_widget_group_id-container']",
+    # Buscar "Cualquiera"
+    {
+        "action": "fill",
+        "selector": "css=body > span > span > span.select2-search.select2-search--dropdown > input||xpath=/html/body/span/span/span[1]/input||xpath=//*[@id='opened-page']/body/span/span/span[1]/input||xpath=//*[@id='opened--view-page']/body/span/span/span[1]/input",
+        "text": "Cualquiera",
+    },
+    # Seleccionar opción "Cualquiera" (o resaltada)
+    "css=#select2-admin_support_tickets_opened_search_widget_group_id-results li.select2-results__option--highlighted||css=#select2-admin_support_tickets_opened_search_widget_group_id-results li.select2-results__option:has-text('Cualquiera')||css=#select2-admin_support_tickets_opened_search_widget_group_id-results li.select2-results__option:has-text('Any')||xpath=//*[@id='select2-admin_support_tickets_opened_search_widget_group_id-results']/li[contains(.,'Cualquiera') or contains(.,'Any')]||xpath=/html/body/span/span/span[2]/ul/li[16]",
+
+    # Socio
+    "css=#select2-admin_support_tickets_opened_search_widget_partner_id-container||xpath=//*[@id='select2-admin_support_tickets_opened_search_widget_partner_id-container']",
+    # Buscar "Cualquiera"
+    {
+        "action": "fill",
+        "selector": "css=body > span > span > span.select2-search.select2-search--dropdown > input||xpath=/html/body/span/span/span[1]/input||xpath=//*[@id='opened-page']/body/span/span/span[1]/input||xpath=//*[@id='opened--view-page']/body/span/span/span[1]/input",
+        "text": "Cualquiera",
+    },
+    # Seleccionar opción "Cualquiera" (o resaltada)
+    "css=#select2-admin_support_tickets_opened_search_widget_partner_id-results li.select2-results__option--highlighted||css=#select2-admin_support_tickets_opened_search_widget_partner_id-results li.select2-results__option:has-text('Cualquiera')||css=#select2-admin_support_tickets_opened_search_widget_partner_id-results li.select2-results__option:has-text('Any')||xpath=//ul[@id='select2-admin_support_tickets_opened_search_widget_partner_id-results']/li[contains(.,'Cualquiera') or contains(.,'Any')]||xpath=/html/body/span/span/span[2]/ul/li[1]",
+
+    # Period: llenar rango de fechas (desde inicio de mes hasta hoy)
+    {
+        "action": "wait_nonempty",
+        "selector": "css=#admin_support_tickets_opened_search_widget_created_at||xpath=//*[@id='admin_support_tickets_opened_search_widget_created_at']||xpath=/html/body/div[2]/div[3]/div[1]/div/div/div[2]/div/div[2]/div/div/form/div/div[2]/div/div/input[1]",
+        "timeout_ms": 300000
+    },
+    # Forzar commit/blur del input de Period
+    {
+        "action": "press",
+        "selector": "css=#admin_support_tickets_opened_search_widget_created_at||xpath=//*[@id='admin_support_tickets_opened_search_widget_created_at']||xpath=/html/body/div[2]/div[3]/div[1]/div/div/div[2]/div/div[2]/div/div/form/div/div[2]/div/div/input[1]",
+        "key": "Tab",
+    },
+    # Esperar a que el botón Aplicar esté habilitado
+    {
+        "action": "wait_enabled",
+        "selector": "css=#admin_support_tickets_opened_search_block > div > div > div > button.btn.btn-primary.ms-4.advanced-filter-apply-button||css=#admin_support_tickets_opened_search_block button.btn.btn-primary.advanced-filter-apply-button||css=button.advanced-filter-apply-button:has-text('Aplicar')||css=button.advanced-filter-apply-button:has-text('Apply')||xpath=//*[@id='admin_support_tickets_opened_search_block']/div/div/div/button[2]||xpath=/html/body/div[2]/div[3]/div[1]/div/div/div[2]/div/div[2]/div/div/div/button[2]||text=Aplicar||text=Apply",
+        "timeout_ms": 120000,
+    },
+    # Aplicar filtros
+    "css=button.advanced-filter-apply-button:has-text('Aplicar')||css=button.advanced-filter-apply-button:has-text('Apply')||css=#admin_support_tickets_opened_search_block button.advanced-filter-apply-button||css=#admin_support_tickets_opened_search_block > div > div > div > button.btn.btn-primary.ms-4.advanced-filter-apply-button||xpath=//*[@id='admin_support_tickets_opened_search_block']/div/div/div/button[2]||xpath=/html/body/div[2]/div[3]/div[1]/div/div/div[2]/div/div[2]/div/div/div/button[2]||text=Aplicar||text=Apply",
+])
+
+# Tabla 2: Clientes -> Lista
+_TABLE2_DEFAULT_STEPS = _normalize_steps([
+    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(2) > div > a",
+    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(2) > div > div > div:nth-child(2) > div > a||xpath=//*[@id='list-page']/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[2]/div/div/div[2]/div/a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[2]/div/div/div[2]/div/a||xpath=//*[@id='list-page']/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[2]/div/a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[2]/div/a",
+])
+
 
 class SplynxSession:
     def __init__(self, config: SplynxConfig, message_sink: MessageSink) -> None:
@@ -65,6 +275,9 @@ class SplynxSession:
         self._page_ready = threading.Event()
         self._page: Page | None = None
 
+        # Último scope resuelto (url, scope). Se invalida en cualquier navegación/cambio de frames.
+        self._scope_cache: tuple[str, LocatorScope] | None = None
+
     def request_extract(self, table_key: str, mode: str = "auto") -> None:
         if table_key not in self._extract_events:
             self._message(f"Tabla desconocida: {table_key}")
@@ -139,17 +352,27 @@ class SplynxSession:
             page = context.new_page()
             self._page = page
 
+            for event in ("framenavigated", "frameattached", "framedetached"):
+                page.on(event, self._invalidate_scope_cache)
+
             page.set_default_timeout(60_000)
 
             self._message("Cargando página de login...")
-            page.goto(self._config.login_url, wait_until="domcontentloaded")
+            # "commit" devuelve apenas llega la respuesta; fill() ya auto-espera a que existan los inputs.
+            page.goto(self._config.login_url, wait_until="commit")
 
             user_sel = self._config.selectors.get("username", "#login")
             pass_sel = self._config.selectors.get("password", "#password")
 
             self._message("Colocando usuario/contraseña en el formulario...")
-            page.locator(user_sel).fill(username)
-            page.locator(pass_sel).fill(password)
+            try:
+                page.locator(user_sel).fill(username, timeout=30_000)
+                page.locator(pass_sel).fill(password, timeout=30_000)
+            except Exception:
+                # Si el formulario no apareció a tiempo, esperar el DOM completo y reintentar una vez.
+                page.wait_for_load_state("domcontentloaded")
+                page.locator(user_sel).fill(username)
+                page.locator(pass_sel).fill(password)
 
             self._page_ready.set()
             self._message(
@@ -165,27 +388,58 @@ class SplynxSession:
                 finally:
                     browser.close()
 
+    _SCOPE_FRAME_IDS = ("opened-page", "list-page", "opened--view-page")
+
+    def _invalidate_scope_cache(self, _frame: Any = None) -> None:
+        self._scope_cache = None
+
     def _get_scope(self, page: Page) -> LocatorScope:
+        cached = self._scope_cache
+        if cached is not None and cached[0] == page.url:
+            scope = cached[1]
+            if not (isinstance(scope, Frame) and scope.is_detached()):
+                return scope
+
+        scope = self._probe_scope(page)
+        self._scope_cache = (page.url, scope)
+        return scope
+
+    def _probe_scope(self, page: Page) -> LocatorScope:
         # Splynx suele renderizar vistas dentro de iframes con distintos IDs según la pantalla.
-        for frame_id in ("opened-page", "list-page", "opened--view-page"):
-            frame_loc = page.locator(f"#{frame_id}")
-            if frame_loc.count() > 0:
+        # Un solo evaluate devuelve el tag de cada candidato (en vez de count + evaluate por ID).
+        try:
+            tags = page.evaluate(
+                """ids => {
+                    const out = {};
+                    for (const id of ids) {
+                        const el = document.getElementById(id);
+                        out[id] = el ? el.tagName.toLowerCase() : null;
+                    }
+                    return out;
+                }""",
+                list(self._SCOPE_FRAME_IDS),
+            )
+        except Exception:
+            tags = {}
+
+        for frame_id in self._SCOPE_FRAME_IDS:
+            if (tags or {}).get(frame_id) == "iframe":
+                # Resolver el Frame real una vez; un FrameLocator re-resuelve el iframe en cada .locator().
                 try:
-                    tag = frame_loc.first.evaluate("el => el.tagName.toLowerCase()")
+                    handle = page.query_selector(f"#{frame_id}")
+                    frame = handle.content_frame() if handle else None
                 except Exception:
-                    tag = None
-
-                if tag == "iframe":
-                    return page.frame_locator(f"#{frame_id}")
+                    frame = None
+                return frame if frame is not None else page.frame_locator(f"#{frame_id}")
 
         return page
 
-    def _click_any(self, scope: LocatorScope, selectors: list[str]) -> None:
+    def _click_any(self, scope: LocatorScope, selectors: Sequence[str], same_element: bool = False) -> None:
         last_exc: Exception | None = None
-        for sel in selectors:
+        for sel, wait_ms in _collapse_css_candidates(selectors, same_element):
             try:
                 loc = scope.locator(sel).first
-                loc.wait_for(state="visible")
+                loc.wait_for(state="visible", timeout=wait_ms)
                 loc.scroll_into_view_if_needed()
                 try:
                     loc.click()
@@ -203,12 +457,12 @@ class SplynxSession:
         if last_exc:
             raise last_exc
 
-    def _fill_any(self, scope: LocatorScope, selectors: list[str], text: str) -> None:
+    def _fill_any(self, scope: LocatorScope, selectors: Sequence[str], text: str, same_element: bool = False) -> None:
         last_exc: Exception | None = None
-        for sel in selectors:
+        for sel, wait_ms in _collapse_css_candidates(selectors, same_element):
             try:
                 loc = scope.locator(sel).first
-                loc.wait_for(state="visible")
+                loc.wait_for(state="visible", timeout=wait_ms)
                 loc.scroll_into_view_if_needed()
                 loc.fill(text)
                 return
@@ -218,12 +472,12 @@ class SplynxSession:
         if last_exc:
             raise last_exc
 
-    def _press_any(self, scope: LocatorScope, selectors: list[str], key: str) -> None:
+    def _press_any(self, scope: LocatorScope, selectors: Sequence[str], key: str, same_element: bool = False) -> None:
         last_exc: Exception | None = None
-        for sel in selectors:
+        for sel, wait_ms in _collapse_css_candidates(selectors, same_element):
             try:
                 loc = scope.locator(sel).first
-                loc.wait_for(state="visible")
+                loc.wait_for(state="visible", timeout=wait_ms)
                 loc.scroll_into_view_if_needed()
                 loc.press(key)
                 return
@@ -233,7 +487,60 @@ class SplynxSession:
         if last_exc:
             raise last_exc
 
-    def _wait_nonempty_any(self, scope: LocatorScope, selectors: list[str], timeout_ms: int) -> None:
+    def _wait_nonempty_any(self, scope: LocatorScope, selectors: Sequence[str], timeout_ms: int) -> None:
+        start = time.monotonic()
+        loop_timeout_ms = timeout_ms
+        queries = _dom_queries(selectors)
+        if queries is not None:
+            # Como el loop de abajo: primero el campo visible y a la vista (el usuario tiene que verlo
+            # para completarlo, p.ej. el Period por defecto).
+            for sel in selectors:
+                try:
+                    loc = scope.locator(sel).first
+                    loc.wait_for(state="visible")
+                    loc.scroll_into_view_if_needed()
+                    break
+                except Exception:
+                    continue
+
+            # Un solo wait_for_function en el frame correcto: el navegador revisa todos los
+            # candidatos (solo visibles) en cada tick y avisa cuando alguno tiene valor.
+            remaining_ms = timeout_ms - (time.monotonic() - start) * 1000.0
+            try:
+                frame = scope_frame(scope)
+                frame.wait_for_function(
+                    """queries => {
+                        for (const [kind, q] of queries) {
+                            let el = null;
+                            try {
+                                el = kind === 'xpath'
+                                    ? document.evaluate(q, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+                                    : document.querySelector(q);
+                            } catch (e) {
+                                el = null;
+                            }
+                            if (!el || !el.getClientRects().length) continue;
+                            const v1 = (typeof el.value === 'string') ? el.value : '';
+                            const v2 = (typeof el.getAttribute === 'function') ? (el.getAttribute('value') || '') : '';
+                            if (String(v1 || v2 || '').trim()) return true;
+                        }
+                        return false;
+                    }""",
+                    arg=queries,
+                    timeout=max(1.0, remaining_ms),
+                    polling=200,
+                )
+                return
+            except Exception as exc:
+                remaining_ms = timeout_ms - (time.monotonic() - start) * 1000.0
+                if remaining_ms <= 0:
+                    raise TimeoutError(f"Timeout esperando valor no vacío en: {' || '.join(selectors)}") from exc
+                # Falló antes de tiempo (p.ej. el frame navegó a mitad de la espera): seguir con el
+                # loop por candidato durante el tiempo restante.
+                loop_timeout_ms = remaining_ms
+
+        # Engines que solo entiende Playwright (text=, :has-text, ...), o fallback tras un error del
+        # wait_for_function: un loop por candidato.
         last_exc: Exception | None = None
         for sel in selectors:
             try:
@@ -243,7 +550,7 @@ class SplynxSession:
 
                 # Espera hasta que el input tenga un valor no vacío.
                 # Importante: hacerlo en el contexto correcto (iframe) vía Locator.
-                deadline = time.monotonic() + (timeout_ms / 1000.0)
+                deadline = time.monotonic() + (loop_timeout_ms / 1000.0)
                 while True:
                     if time.monotonic() > deadline:
                         raise TimeoutError(f"Timeout esperando valor no vacío en: {sel}")
@@ -272,7 +579,7 @@ class SplynxSession:
         if last_exc:
             raise last_exc
 
-    def _wait_enabled_any(self, scope: LocatorScope, selectors: list[str], timeout_ms: int) -> None:
+    def _wait_enabled_any(self, scope: LocatorScope, selectors: Sequence[str], timeout_ms: int) -> None:
         last_exc: Exception | None = None
         for sel in selectors:
             try:
@@ -316,102 +623,51 @@ class SplynxSession:
         if last_exc:
             raise last_exc
 
-    def _render_text(self, text: str) -> str:
+    @staticmethod
+    def _render_text(text: str) -> str:
         # Macros simples para fechas:
         # - {today:%d/%m/%Y}
         # - {month_start:%d/%m/%Y}
-        today = date.today()
-        month_start = today.replace(day=1)
-
-        rendered = text
-        rendered = rendered.replace("{today:%d/%m/%Y}", today.strftime("%d/%m/%Y"))
-        rendered = rendered.replace("{month_start:%d/%m/%Y}", month_start.strftime("%d/%m/%Y"))
-        return rendered
-
-    def _run_step(self, page: Page, scope: LocatorScope, step: Any) -> None:
-        # Backward compatible:
-        # - string => click
-        # - {"action": "click", "selector": "..."}
-        # - {"action": "fill", "selector": "...", "text": "..."}
-        if isinstance(step, str):
-            candidates = [s.strip() for s in step.split("||") if s.strip()]
-            if not candidates:
-                return
-            try:
-                self._click_any(scope, candidates)
-                return
-            except Exception:
-                # Algunos dropdowns de Select2 salen fuera del iframe; probamos en la page raíz.
-                if scope is not page:
-                    self._click_any(page, candidates)
-                else:
-                    raise
-            return
-
-        if isinstance(step, dict):
-            action = str(step.get("action", "click")).lower()
-            selector = step.get("selector")
-            if not selector:
-                return
-
-            if isinstance(selector, str):
-                candidates = [s.strip() for s in selector.split("||") if s.strip()]
-            else:
-                candidates = [str(s).strip() for s in selector if str(s).strip()]
-
-            if action == "fill":
-                text = self._render_text(str(step.get("text", "")))
-                try:
-                    self._fill_any(scope, candidates, text)
-                except Exception:
-                    if scope is not page:
-                        self._fill_any(page, candidates, text)
-                    else:
-                        raise
-                return
-
-            if action == "press":
-                key = str(step.get("key", "Enter"))
-                try:
-                    self._press_any(scope, candidates, key)
-                except Exception:
-                    if scope is not page:
-                        self._press_any(page, candidates, key)
-                    else:
-                        raise
-                return
-
-            if action == "wait_enabled":
-                timeout_ms = int(step.get("timeout_ms", 120_000))
-                try:
-                    self._wait_enabled_any(scope, candidates, timeout_ms=timeout_ms)
-                except Exception:
-                    if scope is not page:
-                        self._wait_enabled_any(page, candidates, timeout_ms=timeout_ms)
-                    else:
-                        raise
-                return
-
-            if action == "wait_nonempty":
-                timeout_ms = int(step.get("timeout_ms", 300_000))  # 5 minutos por defecto
-                try:
-                    self._wait_nonempty_any(scope, candidates, timeout_ms=timeout_ms)
-                except Exception:
-                    if scope is not page:
-                        self._wait_nonempty_any(page, candidates, timeout_ms=timeout_ms)
-                    else:
-                        raise
-                return
+        if "{today" not in text and "{month_start" not in text:
+            return text
+        return _render_date_macros(date.today().toordinal(), text)
 
+    def _with_page_fallback(self, scope: LocatorScope, page: Page, op: Callable[[LocatorScope], Any]) -> Any:
+        try:
+            return op(scope)
+        except Exception:
+            # Algunos dropdowns de Select2 salen fuera del iframe; probamos en la page raíz.
+            if scope is not page:
+                return op(page)
+            raise
+
+    def _run_step(self, page: Page, scope: LocatorScope, step: _NormStep) -> None:
+        # Los candidatos ya vienen separados por _normalize_steps, en orden de prioridad; solo se
+        # prueban unidos si el step declara que son el mismo elemento (same_element).
+        candidates = step.selectors
+
+        if step.action == "fill":
+            text = self._render_text(step.text)
+            self._with_page_fallback(
+                scope, page, lambda s: self._fill_any(s, candidates, text, same_element=step.same_element)
+            )
+        elif step.action == "press":
+            self._with_page_fallback(
+                scope, page, lambda s: self._press_any(s, candidates, step.key, same_element=step.same_element)
+            )
+        elif step.action == "wait_enabled":
+            self._with_page_fallback(
+                scope, page, lambda s: self._wait_enabled_any(s, candidates, timeout_ms=step.timeout_ms)
+            )
+        elif step.action == "wait_nonempty":
+            self._with_page_fallback(
+                scope, page, lambda s: self._wait_nonempty_any(s, candidates, timeout_ms=step.timeout_ms)
+            )
+        else:
             # default: click
-            try:
-                self._click_any(scope, candidates)
-            except Exception:
-                if scope is not page:
-                    self._click_any(page, candidates)
-                else:
-                    raise
-            return
+            self._with_page_fallback(
+                scope, page, lambda s: self._click_any(s, candidates, same_element=step.same_element)
+            )
 
     def _event_loop(self, page: Page) -> None:
         while not self._shutdown_event.is_set():
@@ -1249,10 +1505,10 @@ class SplynxSession:
         match_predicate,
     ) -> str:
         blocks_selector = "css=div[id^='opened-ticket-message-']"
-        dt_selector = "css=div.comment-heading div.comment-title-wrapper span"
-        dt_selector_fallbacks = [
-            dt_selector,
-            "css=div.comment-heading span",
+        # Selectores del timestamp dentro de cada bloque (en orden de preferencia).
+        dt_selectors = [
+            "div.comment-heading div.comment-title-wrapper span",
+            "div.comment-heading span",
         ]
 
         def _get_blocks(container: LocatorScope):
@@ -1268,35 +1524,29 @@ class SplynxSession:
         best_dt: datetime | None = None
         best_str = ""
 
+        # Un solo evaluate_all para todos los bloques: [texto completo, timestamp del heading].
+        # textContent permite leer aunque el bloque esté oculto (activities colapsadas).
         try:
-            count = blocks.count()
+            items = blocks.evaluate_all(
+                """(blocks, dtSelectors) => blocks.slice(0, 400).map(blk => {
+                    let dtRaw = '';
+                    for (const sel of dtSelectors) {
+                        const el = blk.querySelector(sel);
+                        dtRaw = el ? (el.textContent || '').trim() : '';
+                        if (dtRaw) break;
+                    }
+                    return [blk.textContent || '', dtRaw];
+                })""",
+                dt_selectors,
+            )
         except Exception:
-            count = 0
-
-        for i in range(min(count, 400)):
-            blk = blocks.nth(i)
-            try:
-                # text_content permite leer aunque el bloque esté oculto (activities colapsadas)
-                txt = blk.text_content() or ""
-            except Exception:
-                continue
+            items = []
 
+        for txt, dt_raw in items:
             norm = self._norm_text(txt)
             if not match_predicate(norm):
                 continue
 
-            try:
-                dt_raw = ""
-                for dsel in dt_selector_fallbacks:
-                    try:
-                        dt_raw = (blk.locator(dsel).first.text_content() or "").strip()
-                    except Exception:
-                        dt_raw = ""
-                    if dt_raw:
-                        break
-            except Exception:
-                dt_raw = ""
-
             dt = self._parse_activity_datetime(dt_raw)
             if not dt:
                 # Fallback: en algunos casos el timestamp no está en el heading como esperamos,
@@ -1311,14 +1561,18 @@ class SplynxSession:
 
         return best_str
 
+    # Timestamp de activities: "dd/mm/yyyy h:mm:ss [AM|PM]", preferentemente entre paréntesis.
+    _ACTIVITY_DT_RE = re.compile(r"(\d{2}/\d{2}/\d{4}\s+\d{1,2}:\d{2}:\d{2}\s*(?:AM|PM)?)")
+    _ACTIVITY_DT_PAREN_RE = re.compile(r"\(" + _ACTIVITY_DT_RE.pattern + r"\)")
+
     def _parse_activity_datetime(self, s: str) -> datetime | None:
         text = (s or "").strip()
         if not text:
             return None
 
-        candidates = re.findall(r"\((\d{2}/\d{2}/\d{4}\s+\d{1,2}:\d{2}:\d{2}\s*(?:AM|PM)?)\)", text)
+        candidates = self._ACTIVITY_DT_PAREN_RE.findall(text)
         if not candidates:
-            candidates = re.findall(r"(\d{2}/\d{2}/\d{4}\s+\d{1,2}:\d{2}:\d{2}\s*(?:AM|PM)?)", text)
+            candidates = self._ACTIVITY_DT_RE.findall(text)
 
         for cand in reversed(candidates):
             c = cand.strip()
@@ -1344,10 +1598,13 @@ class SplynxSession:
             s = "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
         except Exception:
             pass
-        s = re.sub(r"\s+", " ", s)
+        s = self._WS_RE.sub(" ", s)
         return s
 
     _SCI_RE = re.compile(r"^\s*[-+]?\d+(?:\.\d+)?[eE][-+]?\d+\s*$")
+    _WS_RE = re.compile(r"\s+")
+    _DIGITS_RE = re.compile(r"\d+")
+    _HREF_ID_RE = re.compile(r"[?&]id=(\d+)")
 
     def _id_key(self, value) -> str:
         if value is None:
@@ -1373,7 +1630,7 @@ class SplynxSession:
             except (InvalidOperation, ValueError):
                 pass
 
-        matches = re.findall(r"\d+", s)
+        matches = self._DIGITS_RE.findall(s)
         if not matches:
             return ""
         d = max(matches, key=len)
@@ -1572,6 +1829,20 @@ class SplynxSession:
         except Exception:
             pass
 
+    @staticmethod
+    def _snapshot_rows(rows, limit: int) -> list:
+        """[texto, hrefs (hasta 10 links)] de las primeras `limit` filas, en un solo evaluate_all."""
+        try:
+            return rows.evaluate_all(
+                """(rows, limit) => rows.slice(0, limit).map(tr => [
+                    tr.innerText || '',
+                    Array.from(tr.querySelectorAll('a'), a => (a.getAttribute('href') || '').trim()).slice(0, 10),
+                ])""",
+                limit,
+            )
+        except Exception:
+            return []
+
     def _fast_search_pick_client(self, page: Page, customer_id: str) -> bool:
         wanted_digits = self._id_key(str(customer_id))
         if not wanted_digits:
@@ -1606,18 +1877,8 @@ class SplynxSession:
 
         best_idx: int | None = None
         best_score = -1
-        row_count = 0
-        try:
-            row_count = rows.count()
-        except Exception:
-            row_count = 0
-
-        for i in range(min(row_count, 30)):
-            try:
-                txt = rows.nth(i).inner_text() or ""
-            except Exception:
-                continue
 
+        for i, (txt, _hrefs) in enumerate(self._snapshot_rows(rows, 30)):
             compact = " ".join(txt.split())
             if wanted_digits not in compact:
                 continue
@@ -1685,91 +1946,47 @@ class SplynxSession:
         deadline = time.monotonic() + 15.0
         wanted_re = re.compile(rf"(?<!\d){re.escape(wanted_digits)}(?!\d)")
 
-        def _row_has_exact_ticket_id(row_idx: int) -> bool:
-            row = rows.nth(row_idx)
+        def _href_id_matches(href: str, require_ticket: bool) -> bool:
+            if not href:
+                return False
+            if require_ticket and "ticket" not in href and "tickets" not in href:
+                return False
+            m = self._HREF_ID_RE.search(href)
+            return bool(m and m.group(1) == wanted_digits)
 
+        def _row_has_exact_ticket_id(txt: str, hrefs: list[str]) -> bool:
             # Preferir href con ?id=<wanted> exacto (evita falsos positivos tipo 313118 dentro de 2313118)
+            if any(_href_id_matches(href, True) for href in hrefs[:8]):
+                return True
+            return bool(wanted_re.search(" ".join(txt.split())))
+
+        def _click_link(row_idx: int, link_idx: int) -> bool:
+            link = rows.nth(row_idx).locator("css=a").nth(link_idx)
             try:
-                links = row.locator("css=a")
-                link_count = min(links.count(), 8)
+                link.click()
             except Exception:
-                link_count = 0
-
-            for j in range(link_count):
                 try:
-                    href = (links.nth(j).get_attribute("href") or "").strip()
+                    link.click(force=True)
                 except Exception:
-                    href = ""
-                if not href:
-                    continue
-                if "ticket" not in href and "tickets" not in href:
-                    continue
-                m = re.search(r"[?&]id=(\d+)", href)
-                if m and m.group(1) == wanted_digits:
-                    return True
-
-            try:
-                txt = row.inner_text() or ""
-            except Exception:
-                txt = ""
-            return bool(wanted_re.search(" ".join(txt.split())))
+                    link.evaluate("el => el.click()")
+            return True
 
+        # Una foto de las filas (texto + hrefs) por vuelta en vez de nth()/count() por fila y link.
         while True:
             if time.monotonic() > deadline:
                 return False
 
-            try:
-                row_count = rows.count()
-            except Exception:
-                row_count = 0
-
-            found = False
-            for i in range(min(row_count, 60)):
-                try:
-                    if _row_has_exact_ticket_id(i):
-                        found = True
-                        break
-                except Exception:
-                    continue
-
-            if found:
+            snapshot = self._snapshot_rows(rows, 60)
+            if any(_row_has_exact_ticket_id(txt, hrefs) for txt, hrefs in snapshot):
                 break
             time.sleep(0.25)
 
         # Prioridad absoluta: si existe un link de ticket con href ?id=<wanted>, clickealo directamente.
         # Esto evita que se seleccione la primera opción cuando no corresponde.
-        try:
-            row_count = rows.count()
-        except Exception:
-            row_count = 0
-
-        for i in range(min(row_count, 60)):
-            row = rows.nth(i)
-            try:
-                links = row.locator("css=a")
-                link_count = min(links.count(), 10)
-            except Exception:
-                link_count = 0
-
-            for j in range(link_count):
-                try:
-                    href = (links.nth(j).get_attribute("href") or "").strip()
-                except Exception:
-                    href = ""
-                if not href:
-                    continue
-                if "ticket" not in href and "tickets" not in href:
-                    continue
-                m = re.search(r"[?&]id=(\d+)", href)
-                if m and m.group(1) == wanted_digits:
-                    try:
-                        links.nth(j).click()
-                    except Exception:
-                        try:
-                            links.nth(j).click(force=True)
-                        except Exception:
-                            links.nth(j).evaluate("el => el.click()")
-                    return True
+        for i, (_txt, hrefs) in enumerate(snapshot):
+            for j, href in enumerate(hrefs):
+                if _href_id_matches(href, True):
+                    return _click_link(i, j)
 
         def _first_line(txt: str) -> str:
             t = "\n".join([ln.strip() for ln in (txt or "").splitlines() if ln.strip()])
@@ -1779,17 +1996,8 @@ class SplynxSession:
 
         best_idx: int | None = None
         best_score = -1
-        try:
-            row_count = rows.count()
-        except Exception:
-            row_count = 0
-
-        for i in range(min(row_count, 40)):
-            try:
-                txt = rows.nth(i).inner_text() or ""
-            except Exception:
-                continue
 
+        for i, (txt, _hrefs) in enumerate(snapshot[:40]):
             compact = " ".join(txt.split())
             # Evitar coincidencias parciales dentro de otros números largos.
             if not wanted_re.search(compact):
@@ -1831,22 +2039,9 @@ class SplynxSession:
                 return False
 
         # Si hay un <a href="...id=<wanted>"> dentro de la fila ganadora, clickealo.
-        row = rows.nth(best_idx)
-        try:
-            links = row.locator("css=a")
-            link_count = min(links.count(), 10)
-        except Exception:
-            link_count = 0
-
-        for j in range(link_count):
-            try:
-                href = (links.nth(j).get_attribute("href") or "").strip()
-            except Exception:
-                href = ""
-            if not href:
-                continue
-            m = re.search(r"[?&]id=(\d+)", href)
-            if m and m.group(1) == wanted_digits:
+        links = rows.nth(best_idx).locator("css=a")
+        for j, href in enumerate(snapshot[best_idx][1]):
+            if _href_id_matches(href, False):
                 try:
                     links.nth(j).click()
                     return True
@@ -2338,24 +2533,18 @@ class SplynxSession:
             mode = str(mode or "auto").lower()
 
             # Pasos previos configurables (para navegación en la UI antes de extraer)
-            steps: list[Any] = list(table_cfg.get("steps", []))
+            steps: tuple[_NormStep, ...] = self._config.table_steps.get(table_key, ())
 
             if table_key == "table1" and mode == "manual":
                 # En modo manual el bot solo navega hasta Tickets -> List (y ajusta Acceso rápido).
                 # Luego el usuario coloca filtros y presiona Aplicar.
-                nav_steps: list[Any] = [
-                    # Tickets
-                    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(4) > div > a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[4]/div/a",
-                    # List
-                    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(4) > div > div > div:nth-child(2) > div > a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[4]/div/div/div[2]/div/a",
-                    # Acceso rápido
-                    "css=#select2-admin_support_tickets_opened_filter_quick_access-container||xpath=//*[@id='select2-admin_support_tickets_opened_filter_quick_access-container']",
-                    "css=li[id^='select2-admin_support_tickets_opened_filter_quick_access-result-']:has-text('All tickets')||xpath=//li[starts-with(@id,'select2-admin_support_tickets_opened_filter_quick_access-result-')][contains(.,'All tickets')]||text=All tickets||xpath=/html/body/span/span/span[2]/ul/li[4]",
-                ]
+                nav_steps = _TABLE1_MANUAL_NAV_STEPS
 
                 self._message("Tabla 1 (manual): navegando a Tickets > List...")
                 for step in nav_steps:
-                    self._run_step(page, scope, step)
+                    # Re-resolver el scope en cada paso: un paso puede reemplazar el iframe y dejar
+                    # desconectado el Frame anterior (barato gracias al cache de _get_scope).
+                    self._run_step(page, self._get_scope(page), step)
                     page.wait_for_timeout(600)
 
                 # La navegación puede cambiar el iframe; recalcular scope.
@@ -2380,81 +2569,24 @@ class SplynxSession:
 
             if table_key == "table1" and not steps:
                 # Defaults (Tickets -> List) + filtros nuevos
-                steps = [
-                    # Tickets
-                    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(4) > div > a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[4]/div/a",
-                    # List
-                    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(4) > div > div > div:nth-child(2) > div > a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[4]/div/div/div[2]/div/a",
-                    # Quick access dropdown (Acceso Rápido)
-                    "css=#select2-admin_support_tickets_opened_filter_quick_access-container||xpath=//*[@id='select2-admin_support_tickets_opened_filter_quick_access-container']",
-                    # All tickets option (id suele cambiar; preferimos texto/xpath)
-                    "css=li[id^='select2-admin_support_tickets_opened_filter_quick_access-result-']:has-text('All tickets')||xpath=//li[starts-with(@id,'select2-admin_support_tickets_opened_filter_quick_access-result-')][contains(.,'All tickets')]||text=All tickets||xpath=/html/body/span/span/span[2]/ul/li[4]",
-                    # Filter button
-                    "css=#content > div > div.splynx-top-nav > div.filters-nav > div > div:nth-child(6) > button||xpath=//*[@id='content']/div/div[1]/div[2]/div/div[6]/button||xpath=/html/body/div[2]/div[3]/div[1]/div/div/div[1]/div[2]/div/div[6]/button||text=Filter",
-
-                    # Condition
-                    "css=#select2-admin_support_tickets_opened_search_widget_condition-container||xpath=//*[@id='select2-admin_support_tickets_opened_search_widget_condition-container']",
-                    # All option (id dinámico)
-                    "css=li[id^='select2-admin_support_tickets_opened_search_widget_condition-result-']:has-text('All')||css=li[id^='select2-admin_support_tickets_opened_search_widget_condition-result-']:has-text('Todos')||xpath=//li[starts-with(@id,'select2-admin_support_tickets_opened_search_widget_condition-result-')][contains(.,'All') or contains(.,'Todos')]||xpath=/html/body/span/span/span[2]/ul/li[3]||text=All||text=Todos",
-
-                    # Group
-                    "css=#select2-admin_support_tickets_opened_search_widget_group_id-container||xpath=//*[@id='select2-admin_support_tickets_opened_search_widget_group_id-container']",
-                    # Buscar "Cualquiera"
-                    {
-                        "action": "fill",
-                        "selector": "css=body > span > span > span.select2-search.select2-search--dropdown > input||xpath=/html/body/span/span/span[1]/input||xpath=//*[@id='opened-page']/body/span/span/span[1]/input||xpath=//*[@id='opened--view-page']/body/span/span/span[1]/input",
-                        "text": "Cualquiera",
-                    },
-                    # Seleccionar opción "Cualquiera" (o resaltada)
-                    "css=#select2-admin_support_tickets_opened_search_widget_group_id-results li.select2-results__option--highlighted||css=#select2-admin_support_tickets_opened_search_widget_group_id-results li.select2-results__option:has-text('Cualquiera')||css=#select2-admin_support_tickets_opened_search_widget_group_id-results li.select2-results__option:has-text('Any')||xpath=//*[@id='select2-admin_support_tickets_opened_search_widget_group_id-results']/li[contains(.,'Cualquiera') or contains(.,'Any')]||xpath=/html/body/span/span/span[2]/ul/li[16]",
-
-                    # Socio
-                    "css=#select2-admin_support_tickets_opened_search_widget_partner_id-container||xpath=//*[@id='select2-admin_support_tickets_opened_search_widget_partner_id-container']",
-                    # Buscar "Cualquiera"
-                    {
-                        "action": "fill",
-                        "selector": "css=body > span > span > span.select2-search.select2-search--dropdown > input||xpath=/html/body/span/span/span[1]/input||xpath=//*[@id='opened-page']/body/span/span/span[1]/input||xpath=//*[@id='opened--view-page']/body/span/span/span[1]/input",
-                        "text": "Cualquiera",
-                    },
-                    # Seleccionar opción "Cualquiera" (o resaltada)
-                    "css=#select2-admin_support_tickets_opened_search_widget_partner_id-results li.select2-results__option--highlighted||css=#select2-admin_support_tickets_opened_search_widget_partner_id-results li.select2-results__option:has-text('Cualquiera')||css=#select2-admin_support_tickets_opened_search_widget_partner_id-results li.select2-results__option:has-text('Any')||xpath=//ul[@id='select2-admin_support_tickets_opened_search_widget_partner_id-results']/li[contains(.,'Cualquiera') or contains(.,'Any')]||xpath=/html/body/span/span/span[2]/ul/li[1]",
-
-                    # Period: llenar rango de fechas (desde inicio de mes hasta hoy)
-                    {
-                        "action": "wait_nonempty",
-                        "selector": "css=#admin_support_tickets_opened_search_widget_created_at||xpath=//*[@id='admin_support_tickets_opened_search_widget_created_at']||xpath=/html/body/div[2]/div[3]/div[1]/div/div/div[2]/div/div[2]/div/div/form/div/div[2]/div/div/input[1]",
-                        "timeout_ms": 300000
-                    },
-                    # Forzar commit/blur del input de Period
-                    {
-                        "action": "press",
-                        "selector": "css=#admin_support_tickets_opened_search_widget_created_at||xpath=//*[@id='admin_support_tickets_opened_search_widget_created_at']||xpath=/html/body/div[2]/div[3]/div[1]/div/div/div[2]/div/div[2]/div/div/form/div/div[2]/div/div/input[1]",
-                        "key": "Tab",
-                    },
-                    # Esperar a que el botón Aplicar esté habilitado
-                    {
-                        "action": "wait_enabled",
-                        "selector": "css=#admin_support_tickets_opened_search_block > div > div > div > button.btn.btn-primary.ms-4.advanced-filter-apply-button||css=#admin_support_tickets_opened_search_block button.btn.btn-primary.advanced-filter-apply-button||css=button.advanced-filter-apply-button:has-text('Aplicar')||css=button.advanced-filter-apply-button:has-text('Apply')||xpath=//*[@id='admin_support_tickets_opened_search_block']/div/div/div/button[2]||xpath=/html/body/div[2]/div[3]/div[1]/div/div/div[2]/div/div[2]/div/div/div/button[2]||text=Aplicar||text=Apply",
-                        "timeout_ms": 120000,
-                    },
-                    # Aplicar filtros
-                    "css=button.advanced-filter-apply-button:has-text('Aplicar')||css=button.advanced-filter-apply-button:has-text('Apply')||css=#admin_support_tickets_opened_search_block button.advanced-filter-apply-button||css=#admin_support_tickets_opened_search_block > div > div > div > button.btn.btn-primary.ms-4.advanced-filter-apply-button||xpath=//*[@id='admin_support_tickets_opened_search_block']/div/div/div/button[2]||xpath=/html/body/div[2]/div[3]/div[1]/div/div/div[2]/div/div[2]/div/div/div/button[2]||text=Aplicar||text=Apply",
-                ]
+                steps = _TABLE1_DEFAULT_STEPS
 
             if table_key == "table2" and not steps:
                 # Defaults: Clientes -> Lista
-                steps = [
-                    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(2) > div > a",
-                    "css=body > div.splynx-wrapper > div.main > nav > div > div > div.sidebar-menu > div > div.menu-list > div:nth-child(2) > div > div > div:nth-child(2) > div > a||xpath=//*[@id='list-page']/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[2]/div/div/div[2]/div/a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[2]/div/div/div[2]/div/a||xpath=//*[@id='list-page']/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[2]/div/a||xpath=/html/body/div[2]/div[3]/nav/div/div/div[2]/div/div[1]/div[2]/div/a",
-                ]
+                steps = _TABLE2_DEFAULT_STEPS
 
             # Si hay steps, ejecutarlos en orden. Permitimos fallbacks por paso con separador "||".
             if steps:
                 self._message(f"Ejecutando navegación previa para {table_key}...")
                 for step in steps:
-                    self._run_step(page, scope, step)
+                    # Re-resolver el scope en cada paso: un paso puede reemplazar el iframe y dejar
+                    # desconectado el Frame anterior (barato gracias al cache de _get_scope).
+                    self._run_step(page, self._get_scope(page), step)
                     page.wait_for_timeout(600)
 
+                # La navegación puede reemplazar el iframe (y dejar el Frame anterior desconectado).
+                scope = self._get_scope(page)
+
             if table_key == "table1":
                 # Luego de completar filtros, exporta la tabla visible a Excel.
                 output_xlsx = os.path.join("output", "Datos Splynx.xlsx")
@@ -2495,10 +2627,8 @@ class SplynxSession:
     def _tickets_first_row_marker(self, scope: LocatorScope) -> str:
         table_sel = "css=#admin_support_tickets_opened_list"
         try:
-            first_row = scope.locator(f"{table_sel} tbody tr").first
-            if first_row.count() == 0:
-                return ""
-            return " ".join(first_row.inner_text().strip().split())
+            # evaluate_all no auto-espera: una sola llamada devuelve "" si aún no hay filas.
+            return scope.locator(f"{table_sel} tbody tr").evaluate_all(FIRST_ROW_TEXT_JS)
         except Exception:
             return ""
 
@@ -2515,72 +2645,88 @@ class SplynxSession:
             "text=Apply",
         ]
 
+        def _find_visible():
+            # Una pasada sin auto-espera, en orden de prioridad (el botón del search block primero)
+            # y solo entre coincidencias visibles: una oculta no tapa a la siguiente.
+            for sel in selectors:
+                try:
+                    loc = scope.locator(f"{sel} >> visible=true").first
+                    if loc.is_visible():
+                        return loc
+                except Exception:
+                    continue
+            return None
+
         start = time.monotonic()
-        last_exc: Exception | None = None
 
         # Esperar a que el botón exista y esté visible (normalmente aparece al abrir Filter).
-        apply_loc = None
-        for sel in selectors:
-            try:
-                loc = scope.locator(sel).first
-                loc.wait_for(state="visible", timeout=5_000)
-                apply_loc = loc
-                break
-            except Exception as exc:
-                last_exc = exc
-                continue
-
+        # Backoff exponencial (0.02s .. 2s) entre pasadas.
+        appear_sleeper = BackoffSleeper(timeout_s, cap=2.0)
+        apply_loc = _find_visible()
         while apply_loc is None:
-            if time.monotonic() - start > timeout_s:
+            if not appear_sleeper.sleep():
                 raise TimeoutError("Timeout esperando que aparezca el botón 'Aplicar'.")
-            # reintentar encontrarlo
-            for sel in selectors:
-                try:
-                    loc = scope.locator(sel).first
-                    loc.wait_for(state="visible", timeout=2_000)
-                    apply_loc = loc
-                    break
-                except Exception as exc:
-                    last_exc = exc
-                    continue
-            if apply_loc is None:
-                time.sleep(0.25)
+            apply_loc = _find_visible()
+
+        def _install_listener(loc, reset: bool) -> None:
+            # Listener delegado en el document (fase de captura), una vez por documento: sigue
+            # contando aunque Splynx re-renderice el botón, sin tener que re-enlazarlo.
+            loc.evaluate(
+                """(el, reset) => {
+                    try { if (reset || !window.__splynxApplyClicks) window.__splynxApplyClicks = 0; } catch(e) {}
+                    window.__splynxApplyButton = el;
+                    if (!document.__splynxApplyBound) {
+                        document.__splynxApplyBound = true;
+                        document.addEventListener('click', (ev) => {
+                            const target = ev.target;
+                            if (!(target instanceof Element)) return;
+                            const btn = window.__splynxApplyButton;
+                            if (target.closest('button.advanced-filter-apply-button') || (btn && btn.contains(target))) {
+                                window.__splynxApplyClicks = (window.__splynxApplyClicks || 0) + 1;
+                            }
+                        }, true);
+                    }
+                }""",
+                reset,
+            )
 
         # Instalar listener una vez (en el frame donde vive el botón)
         try:
-            apply_loc.evaluate(
-                """el => {
-                    try { window.__splynxApplyClicks = 0; } catch(e) {}
-                    if (!el.__splynxBound) {
-                        el.__splynxBound = true;
-                        el.addEventListener('click', () => { window.__splynxApplyClicks = (window.__splynxApplyClicks || 0) + 1; }, true);
-                    }
-                }"""
-            )
+            _install_listener(apply_loc, reset=True)
         except Exception:
             # Si no se puede instalar, igual intentamos detectar cambios de tabla luego.
             pass
 
-        # Esperar el click
+        # Esperar el click: el frame del botón evalúa el contador y avisa cuando sube,
+        # sin polling desde Python.
+        refind_sleeper = BackoffSleeper(timeout_s - (time.monotonic() - start))
         while True:
-            if time.monotonic() - start > timeout_s:
+            remaining_ms = timeout_s * 1000.0 - (time.monotonic() - start) * 1000.0
+            if remaining_ms <= 0:
                 raise TimeoutError("Timeout esperando clic en 'Aplicar'.")
+
+            if apply_loc is None:
+                # El frame navegó/se recargó (el listener del document se perdió): re-encontrar
+                # el botón y volver a instalarlo.
+                apply_loc = _find_visible()
+                if apply_loc is None:
+                    refind_sleeper.sleep()
+                    continue
+                try:
+                    _install_listener(apply_loc, reset=False)
+                except Exception:
+                    pass
+
             try:
-                clicks = apply_loc.evaluate("() => window.__splynxApplyClicks || 0")
-                if int(clicks) >= 1:
-                    return
+                frame = apply_loc.element_handle(timeout=1_000).owner_frame()
+                frame.wait_for_function(
+                    "() => (window.__splynxApplyClicks || 0) >= 1",
+                    timeout=remaining_ms,
+                    polling=100,
+                )
+                return
             except Exception:
-                # si el botón desaparece/re-renderiza, re-encontrarlo
                 apply_loc = None
-                for sel in selectors:
-                    try:
-                        loc = scope.locator(sel).first
-                        loc.wait_for(state="visible", timeout=1_000)
-                        apply_loc = loc
-                        break
-                    except Exception:
-                        continue
-            time.sleep(0.25)
 
     def _wait_for_tickets_reload_after_apply(
         self,
@@ -2599,10 +2745,42 @@ class SplynxSession:
         if start_marker is None:
             start_marker = self._tickets_first_row_marker(scope)
 
-        start = time.monotonic()
+        sleeper = BackoffSleeper(timeout_s)
         seen_processing = False
+
+        # Misma lógica que el loop de abajo, pero evaluada en el navegador con un solo
+        # wait_for_function; el flag de "processing visto" vive en window entre ticks.
+        try:
+            frame = scope_frame(scope)
+            frame.evaluate("() => { window.__splynxSeenProcessing = false; }")
+            frame.wait_for_function(
+                """([sel, marker]) => {
+                    const firstRow = () => %s;
+                    const proc = document.querySelector('div.dataTables_processing');
+                    if (proc && proc.getClientRects().length && getComputedStyle(proc).visibility !== 'hidden') {
+                        window.__splynxSeenProcessing = true;
+                        return false;
+                    }
+                    const t = document.querySelector(sel);
+                    if (t && t.querySelectorAll('tbody tr').length > 0) {
+                        if (t.querySelector('tbody tr td.dataTables_empty')) return true;
+                        if (window.__splynxSeenProcessing) return true;
+                    }
+                    return !!marker && firstRow() !== marker;
+                }"""
+                % FIRST_ROW_OF_SEL_JS,
+                arg=[table_sel[len("css="):], start_marker or ""],
+                timeout=timeout_s * 1000,
+                polling=50,
+            )
+            return
+        except Exception:
+            # Timeout: igual dejamos seguir para no bloquear (como el loop). Si el frame se
+            # recargó a mitad de la espera, el loop cubre el tiempo restante.
+            pass
+
         while True:
-            if time.monotonic() - start > timeout_s:
+            if sleeper.expired():
                 # Si nunca vimos processing ni cambió marker, igual dejamos seguir para no bloquear.
                 return
 
@@ -2611,7 +2789,7 @@ class SplynxSession:
                 proc = scope.locator("css=div.dataTables_processing").first
                 if proc.count() > 0 and proc.is_visible():
                     seen_processing = True
-                    time.sleep(0.25)
+                    sleeper.sleep()
                     continue
             except Exception:
                 pass
@@ -2637,4 +2815,4 @@ class SplynxSession:
             if start_marker and self._tickets_first_row_marker(scope) != start_marker:
                 return
 
-            time.sleep(0.25)
+            sleeper.sleep()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import csv
+import functools
 import re
 import time
 from dataclasses import dataclass
@@ -12,43 +13,143 @@ from typing import Protocol
 from openpyxl import Workbook
 from openpyxl.reader.excel import load_workbook
 
+from .playwright_helpers import FIRST_ROW_OF_SEL_JS, FIRST_ROW_TEXT_JS, BackoffSleeper, scope_frame
+
+
+_DIGITS_RE = re.compile(r"\d+")
+# Acentos de los headers en español (ya en minúsculas) -> ASCII.
+_ACCENT_TRANS = str.maketrans("áéíóúüñàèìòù", "aeiouunaeiou")
+
 
 class LocatorScope(Protocol):
     def locator(self, selector: str):  # playwright's Locator
         ...
 
 
+@functools.lru_cache(maxsize=512)
+def _norm_header(s: str) -> str:
+    """Header normalizado: minúsculas y espacios colapsados."""
+    return " ".join((s or "").strip().split()).lower()
+
+
+@functools.lru_cache(maxsize=512)
+def _norm_header_ascii(s: str) -> str:
+    """Como _norm_header, pero además sin acentos (para matchear "actualización" vs "actualizacion")."""
+    return " ".join((s or "").lower().translate(_ACCENT_TRANS).split())
+
+
+# Por cada th: texto visible + identificadores estructurales que DataTables/Splynx suelen poner.
+_HEADER_CELLS_JS = """t => Array.from(t.querySelectorAll('thead th'), th => [
+    th.innerText || '',
+    th.getAttribute('data-column-id') || '',
+    th.getAttribute('data-name') || '',
+    th.getAttribute('data-column') || '',
+])"""
+
+
+def _header_index(table, norm) -> dict[str, int]:
+    """Mapea header normalizado (texto y data-*) -> índice 0-based de la columna, en un solo evaluate."""
+    try:
+        cells = table.evaluate(_HEADER_CELLS_JS)
+    except Exception:
+        return {}
+
+    # Primero todos los textos visibles; los data-* solo completan claves que no choquen con ellos.
+    m: dict[str, int] = {}
+    for pos in range(4):
+        for idx, keys in enumerate(cells):
+            key = norm(keys[pos])
+            if key and key not in m:
+                m[key] = idx
+    return m
+
+
+# Predicados para wait_for_function: el navegador revisa el estado de la DataTable y avisa apenas
+# cambia, sin ida y vuelta por cada count()/is_visible() desde Python.
+_DT_READY_JS = """sel => {
+    const proc = document.querySelector('div.dataTables_processing');
+    if (proc && proc.getClientRects().length && getComputedStyle(proc).visibility !== 'hidden') return false;
+    const t = document.querySelector(sel);
+    return !!t && t.querySelectorAll('tbody tr').length > 0;
+}"""
+
+_DT_PAGE_CHANGED_JS = """([sel, old]) => {
+    const txt = %s;
+    return !!txt && txt !== old;
+}""" % FIRST_ROW_OF_SEL_JS
+
+# El li "Next" de DataTables existe y no está deshabilitado.
+_NEXT_ENABLED_JS = "lis => lis.length > 0 && !(lis[0].getAttribute('class') || '').toLowerCase().includes('disabled')"
+
+
+def _plain_css(selector: str) -> str | None:
+    """Quita el prefijo css=; None si el selector usa otro engine de Playwright."""
+    return selector[len("css="):] if selector.startswith("css=") else None
+
+
+def _wait_js(scope: LocatorScope, js: str, arg, timeout_s: float) -> bool:
+    """wait_for_function en el frame del scope. False si venció el tiempo o el frame se recargó."""
+    try:
+        scope_frame(scope).wait_for_function(js, arg=arg, timeout=max(1.0, timeout_s * 1000), polling=50)
+        return True
+    except Exception:
+        return False
+
+
+# Lee todas las filas (tr) y sus celdas (th/td) en el navegador, con espacios ya normalizados.
+_TABLE_ROWS_JS = """t => Array.from(t.querySelectorAll('tr'), r =>
+    Array.from(r.querySelectorAll('th, td'), c => (c.innerText || '').replace(/\\s+/g, ' ').trim())
+)"""
+
+
+def _extract_rows_js(scope: LocatorScope, selector: str) -> List[List[str]]:
+    """Extrae la tabla completa con un solo evaluate (en vez de un inner_text por celda)."""
+    return scope.locator(selector).first.evaluate(_TABLE_ROWS_JS)
+
+
+# Lee las filas del tbody de una DataTable devolviendo solo las columnas pedidas (índices 0-based;
+# -1 o fuera de rango => ""). Con withCustomerId agrega al final el ID tomado del primer
+# a[href*="customer"] que tenga dígitos (grupo de dígitos más largo).
+_PAGE_ROWS_JS = """(t, [idxs, withCustomerId]) => Array.from(t.querySelectorAll('tbody tr'), tr => {
+    const tds = tr.querySelectorAll('td');
+    const row = idxs.map(i => (i < 0 || i >= tds.length) ? '' : (tds[i].innerText || '').replace(/\\s+/g, ' ').trim());
+    if (withCustomerId) {
+        let customerId = '';
+        for (const a of tr.querySelectorAll('a[href*="customer"]')) {
+            const digits = (a.getAttribute('href') || '').match(/\\d+/g) || [];
+            const longest = digits.reduce((best, d) => d.length > best.length ? d : best, '');
+            if (longest) {
+                customerId = longest;
+                break;
+            }
+        }
+        row.push(customerId);
+    }
+    return row;
+})"""
+
+
+def _read_page_rows_js(table, indices: List[int], with_customer_id: bool = False) -> List[List[str]]:
+    """Una sola llamada por página: el navegador arma la matriz de textos ya normalizados."""
+    return table.evaluate(_PAGE_ROWS_JS, [indices, with_customer_id])
+
+
 def extract_table_to_csv(scope: LocatorScope, selector: str, output_csv: str) -> None:
     table = scope.locator(selector).first
     table.wait_for(state="visible")
 
-    row_loc = table.locator("tr")
-    row_count = row_loc.count()
-
-    rows: List[List[str]] = []
-    max_cols = 0
-
-    for i in range(row_count):
-        row = row_loc.nth(i)
-        cell_loc = row.locator("th, td")
-        cell_count = cell_loc.count()
-        cells = []
-        for j in range(cell_count):
-            txt = cell_loc.nth(j).inner_text().strip()
-            txt = " ".join(txt.split())
-            cells.append(txt)
-        max_cols = max(max_cols, len(cells))
-        if cells:
-            rows.append(cells)
-
-    # Normaliza filas para que todas tengan el mismo número de columnas
-    for r in rows:
-        if len(r) < max_cols:
-            r.extend([""] * (max_cols - len(r)))
-
-    with open(output_csv, "w", newline="", encoding="utf-8-sig") as f:
+    rows = [cells for cells in _extract_rows_js(scope, selector) if cells]
+    widths = set(map(len, rows))
+    max_cols = max(widths, default=0)
+
+    with open(output_csv, "w", newline="", encoding="utf-8-sig", buffering=1 << 20) as f:
         w = csv.writer(f)
-        w.writerows(rows)
+        if len(widths) <= 1:
+            # Caso normal: todas las filas tienen el mismo ancho, no hay nada que rellenar.
+            w.writerows(rows)
+        else:
+            # Normaliza filas al mismo número de columnas a medida que se escriben.
+            w.writerows(r + [""] * (max_cols - len(r)) for r in rows)
 
 
 def extract_tickets_to_excel(
@@ -60,43 +161,13 @@ def extract_tickets_to_excel(
     table = scope.locator(table_selector).first
     table.wait_for(state="visible")
 
-    def _norm_header(s: str) -> str:
-        # Normaliza: minúsculas, espacios, y sin acentos (para matchear "actualización" vs "actualizacion").
-        s = (s or "").strip().lower()
-        try:
-            import unicodedata
-
-            s = "".join(
-                c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c)
-            )
-        except Exception:
-            pass
-        s = " ".join(s.split())
-        return s
-
-    def _header_index_map() -> dict[str, int]:
-        """Mapea header normalizado -> índice 0-based de la columna en la tabla."""
-        table_loc = scope.locator(table_selector).first
-        ths = table_loc.locator("thead tr th")
-        try:
-            texts = ths.all_inner_texts()
-        except Exception:
-            texts = []
-
-        m: dict[str, int] = {}
-        for idx, t in enumerate(texts):
-            key = _norm_header(t)
-            if key and key not in m:
-                m[key] = idx
-        return m
-
-    header_map = _header_index_map()
+    header_map = _header_index(table, _norm_header_ascii)
 
     def _pick_idx(*aliases: str) -> int | None:
         for a in aliases:
             if not a:
                 continue
-            key = _norm_header(a)
+            key = _norm_header_ascii(a)
             if key in header_map:
                 return header_map[key]
         return None
@@ -170,8 +241,8 @@ def extract_tickets_to_excel(
 
     def _normalize_id_cliente(text: str) -> str:
         # En la UI viene como "R135921" o "G119230 (lead)".
-        m = re.search(r"(\d+)", text)
-        return m.group(1) if m else ""
+        m = _DIGITS_RE.search(text)
+        return m.group(0) if m else ""
 
     @dataclass(frozen=True)
     class _TableCfg:
@@ -185,46 +256,23 @@ def extract_tickets_to_excel(
         next_a_selector="css=#admin_support_tickets_opened_list_next > a",
     )
 
-    def read_page_rows() -> List[List[str]]:
-        _wait_for_datatable_ready(scope, table_selector=cfg.table_selector, timeout_s=60.0)
-        row_loc = table.locator("tbody tr")
-        row_count = row_loc.count()
+    indices = [-1 if zero_idx is None else zero_idx for _, zero_idx in col_map]
+    id_cliente_pos = [name for name, _ in col_map].index("ID Cliente")
 
+    def read_page_rows() -> List[List[str]]:
         page_rows: List[List[str]] = []
-        for i in range(row_count):
-            row = row_loc.nth(i)
-            cells = row.locator("td")
-            cell_count = cells.count()
-
-            out_row: List[str] = []
-            for col_name, zero_idx in col_map:
-                if zero_idx is None or zero_idx < 0 or zero_idx >= cell_count:
-                    out_row.append("")
-                    continue
-                txt = cells.nth(zero_idx).inner_text().strip()
-                txt = " ".join(txt.split())
-                if col_name == "ID Cliente":
-                    txt = _normalize_id_cliente(txt)
-                out_row.append(txt)
-
-            if any(v for v in out_row):
+        for out_row in _read_page_rows_js(table, indices):
+            out_row[id_cliente_pos] = _normalize_id_cliente(out_row[id_cliente_pos])
+            if any(out_row):
                 page_rows.append(out_row)
         return page_rows
 
     def page_marker() -> str:
         # Marca simple: primera fila completa. Útil para esperar cambio tras "Next".
-        first_row = table.locator("tbody tr").first
-        if first_row.count() == 0:
-            return ""
-        txt = first_row.inner_text().strip()
-        return " ".join(txt.split())
+        return table.locator("tbody tr").evaluate_all(FIRST_ROW_TEXT_JS)
 
     def is_next_enabled() -> bool:
-        li = scope.locator(cfg.next_li_selector).first
-        if li.count() == 0:
-            return False
-        cls = (li.get_attribute("class") or "").lower()
-        return "disabled" not in cls and "paginate_button disabled" not in cls
+        return scope.locator(cfg.next_li_selector).evaluate_all(_NEXT_ENABLED_JS)
 
     def click_next() -> None:
         scope.locator(cfg.next_a_selector).first.click()
@@ -233,9 +281,13 @@ def extract_tickets_to_excel(
         if not old:
             time.sleep(1.0)
             return
-        start = time.monotonic()
+        sleeper = BackoffSleeper(timeout_s)
+        css = _plain_css(cfg.table_selector)
+        if css is not None and _wait_js(scope, _DT_PAGE_CHANGED_JS, [css, old], timeout_s):
+            return
+        # Fallback (engine no-CSS o frame recargado): polling por el tiempo restante.
         while True:
-            if time.monotonic() - start > timeout_s:
+            if sleeper.expired():
                 return
             try:
                 new = page_marker()
@@ -243,28 +295,78 @@ def extract_tickets_to_excel(
                 new = ""
             if new and new != old:
                 return
-            time.sleep(0.25)
+            sleeper.sleep()
 
     wb = _open_or_create_workbook(output_xlsx)
     ws = _get_fresh_sheet(wb, sheet_name)
     ws.append([name for name, _ in col_map])
 
-    # Recorre todas las páginas existentes
-    while True:
-        _wait_for_datatable_ready(scope, table_selector=cfg.table_selector, timeout_s=60.0)
-        for r in read_page_rows():
-            ws.append(r)
+    prev_page_len = _enlarge_datatable_page(scope, cfg.table_selector, timeout_s=60.0)
+
+    try:
+        # Solo se espera el AJAX si la tabla es server-side; y si el "Next" no dispara uno
+        # reconocible, dejamos de esperarlo en las páginas siguientes.
+        expect_xhr = _is_server_side_datatable(scope, cfg.table_selector)
 
-        if not is_next_enabled():
-            break
+        # La tabla se espera lista una vez antes del loop y otra tras cada cambio de página.
+        _wait_for_datatable_ready(scope, table_selector=cfg.table_selector, timeout_s=60.0)
 
-        old = page_marker()
-        click_next()
-        wait_page_changed(old)
+        # Recorre todas las páginas existentes
+        while True:
+            for r in read_page_rows():
+                ws.append(r)
+
+            if not is_next_enabled():
+                break
+
+            old = page_marker()
+            if expect_xhr:
+                expect_xhr = _click_expecting_xhr(table, click_next, "tickets", timeout_s=20.0)
+            else:
+                click_next()
+            # Con la respuesta ya recibida solo falta el redibujado, que esta espera detecta al instante.
+            wait_page_changed(old)
+            _wait_for_datatable_ready(scope, table_selector=cfg.table_selector, timeout_s=60.0)
+    finally:
+        # No dejar la tabla del usuario con la página agrandada.
+        _restore_datatable_page(scope, cfg.table_selector, prev_page_len)
 
     wb.save(output_xlsx)
 
 
+# Aliases frecuentes en Splynx/variantes para los headers de la tabla de clientes
+# (además del propio nombre de la columna).
+_CUSTOMER_HEADER_ALIASES: dict[str, tuple[str, ...]] = {
+    "Estado de Servicio": ("estado de servicio",),
+    "Login del Portal": ("login",),
+    "Nombre Completo": ("nombre",),
+    "Número de Teléfono": ("numero",),
+    "Tarifas de Internet": ("tarifas",),
+    "Rangos IP": ("ip",),
+    "Servicio usuario": ("servicio usario", "servicio usuario", "user service"),
+    "Socio": ("partner",),
+    "Residencia/Urbanización": ("residencia",),
+}
+
+
+def _resolve_columns(
+    header_to_idx: dict[str, int],
+    col_map: list[tuple[str, int]],
+    aliases: dict[str, tuple[str, ...]],
+) -> List[int]:
+    """Índice 0-based de cada columna: por header visible (nombre o alias) o, si no, el índice fijo 1-based."""
+    resolved: List[int] = []
+    for col_name, one_based_idx in col_map:
+        for name in (col_name, *aliases.get(col_name, ())):
+            key = _norm_header(name)
+            if key in header_to_idx:
+                resolved.append(header_to_idx[key])
+                break
+        else:
+            resolved.append(one_based_idx - 1)
+    return resolved
+
+
 def extract_customers_to_excel(
     scope: LocatorScope,
     output_xlsx: str,
@@ -279,71 +381,10 @@ def extract_customers_to_excel(
     _wait_for_datatable_ready(scope, table_selector=table_selector, timeout_s=90.0)
 
     def _digits_longest(s: str) -> str:
-        m = re.findall(r"\d+", s or "")
+        m = _DIGITS_RE.findall(s or "")
         return max(m, key=len) if m else ""
 
-    def _normalize_spaces(s: str) -> str:
-        return " ".join((s or "").strip().split())
-
-    def _norm_header(s: str) -> str:
-        s = _normalize_spaces(s).lower()
-        s = re.sub(r"\s+", " ", s)
-        return s
-
-    def _build_header_index() -> dict[str, int]:
-        """Mapea header visible -> índice 0-based del TD correspondiente."""
-        try:
-            ths = table.locator("thead th")
-            texts = ths.all_inner_texts()
-        except Exception:
-            return {}
-
-        header_to_idx: dict[str, int] = {}
-        for idx, t in enumerate(texts):
-            key = _norm_header(t)
-            if key and key not in header_to_idx:
-                header_to_idx[key] = idx
-        return header_to_idx
-
-    header_to_idx = _build_header_index()
-
-    def _pick_col_index(fallback_one_based: int, *header_names: str) -> int:
-        for name in header_names:
-            key = _norm_header(name)
-            if key in header_to_idx:
-                return header_to_idx[key]
-        return fallback_one_based - 1
-
-    def _extract_customer_id_from_row(row) -> str:
-        """Obtiene el ID real del cliente desde un enlace (si existe) o desde el texto."""
-        # 1) Preferir hrefs que suelen contener el ID numérico
-        try:
-            links = row.locator('a[href*="customer"]').all()
-        except Exception:
-            links = []
-
-        for a in links:
-            try:
-                href = a.get_attribute("href") or ""
-                d = _digits_longest(href)
-                if d:
-                    return d
-            except Exception:
-                continue
-
-        # 2) Fallback: usar la celda de la columna "ID" (si existe) y extraer dígitos
-        try:
-            id_idx = _pick_col_index(3, "ID")
-            cells = row.locator("td")
-            if 0 <= id_idx < cells.count():
-                txt = _normalize_spaces(cells.nth(id_idx).inner_text())
-                d = _digits_longest(txt)
-                if d:
-                    return d
-        except Exception:
-            pass
-
-        return ""
+    header_to_idx = _header_index(table, _norm_header)
 
     # Índices (1-based) como fallback; primero intentamos ubicar por el texto del header.
     # Se agregó la columna "Servicio usuario" (th:nth-child(9)).
@@ -371,69 +412,30 @@ def extract_customers_to_excel(
     next_li_selector = "css=#customers_list_table_next"
     next_a_selector = "css=#customers_list_table_next > a"
 
-    def read_page_rows() -> List[List[str]]:
-        _wait_for_datatable_ready(scope, table_selector=table_selector, timeout_s=90.0)
-        row_loc = table.locator("tbody tr")
-        row_count = row_loc.count()
+    id_pos = [name for name, _ in col_map].index("ID")
+
+    # Intentar ubicar cada columna por header visible; si no, usar el índice fijo.
+    indices = _resolve_columns(header_to_idx, col_map, _CUSTOMER_HEADER_ALIASES)
 
+    def read_page_rows() -> List[List[str]]:
         page_rows: List[List[str]] = []
-        for i in range(row_count):
-            row = row_loc.nth(i)
-            cells = row.locator("td")
-            cell_count = cells.count()
-
-            # ID: intentar leer el ID real (del href / texto) una sola vez por fila
-            real_customer_id = _extract_customer_id_from_row(row)
-
-            out_row: List[str] = []
-            for col_name, one_based_idx in col_map:
-                # Para ID, usamos el valor robusto (si existe)
-                if col_name == "ID" and real_customer_id:
-                    out_row.append(real_customer_id)
-                    continue
-
-                # Intentar ubicar la columna por header visible; si no, usar el índice fijo.
-                zero_idx = _pick_col_index(
-                    one_based_idx,
-                    col_name,
-                    # aliases frecuentes en Splynx/variantes
-                    "estado de servicio" if col_name == "Estado de Servicio" else "",
-                    "login" if col_name == "Login del Portal" else "",
-                    "nombre" if col_name == "Nombre Completo" else "",
-                    "numero" if col_name == "Número de Teléfono" else "",
-                    "tarifas" if col_name == "Tarifas de Internet" else "",
-                    "ip" if col_name == "Rangos IP" else "",
-                    "servicio usario" if col_name == "Servicio usuario" else "",
-                    "servicio usuario" if col_name == "Servicio usuario" else "",
-                    "user service" if col_name == "Servicio usuario" else "",
-                    "partner" if col_name == "Socio" else "",
-                    "residencia" if col_name == "Residencia/Urbanización" else "",
-                )
-                if zero_idx < 0 or zero_idx >= cell_count:
-                    out_row.append("")
-                    continue
-                txt = cells.nth(zero_idx).inner_text().strip()
-                txt = " ".join(txt.split())
-                out_row.append(txt)
-
-            if any(v for v in out_row):
+        for out_row in _read_page_rows_js(table, indices, with_customer_id=True):
+            # ID real del cliente: primero el href del enlace, luego los dígitos de la celda "ID".
+            href_id = out_row.pop()
+            real_customer_id = href_id or _digits_longest(out_row[id_pos])
+            if real_customer_id:
+                out_row[id_pos] = real_customer_id
+
+            if any(out_row):
                 page_rows.append(out_row)
 
         return page_rows
 
     def page_marker() -> str:
-        first_row = table.locator("tbody tr").first
-        if first_row.count() == 0:
-            return ""
-        txt = first_row.inner_text().strip()
-        return " ".join(txt.split())
+        return table.locator("tbody tr").evaluate_all(FIRST_ROW_TEXT_JS)
 
     def is_next_enabled() -> bool:
-        li = scope.locator(next_li_selector).first
-        if li.count() == 0:
-            return False
-        cls = (li.get_attribute("class") or "").lower()
-        return "disabled" not in cls and "paginate_button disabled" not in cls
+        return scope.locator(next_li_selector).evaluate_all(_NEXT_ENABLED_JS)
 
     def click_next() -> None:
         scope.locator(next_a_selector).first.click()
@@ -442,9 +444,13 @@ def extract_customers_to_excel(
         if not old:
             time.sleep(1.0)
             return
-        start = time.monotonic()
+        sleeper = BackoffSleeper(timeout_s)
+        css = _plain_css(table_selector)
+        if css is not None and _wait_js(scope, _DT_PAGE_CHANGED_JS, [css, old], timeout_s):
+            return
+        # Fallback (engine no-CSS o frame recargado): polling por el tiempo restante.
         while True:
-            if time.monotonic() - start > timeout_s:
+            if sleeper.expired():
                 return
             try:
                 new = page_marker()
@@ -452,49 +458,188 @@ def extract_customers_to_excel(
                 new = ""
             if new and new != old:
                 return
-            time.sleep(0.25)
+            sleeper.sleep()
 
-    pages_done = 0
-    rows_written = 0
+    # max_pages cuenta páginas de la UI: solo agrandamos la página si no hay ese límite.
+    prev_page_len = _enlarge_datatable_page(scope, table_selector, timeout_s=90.0) if max_pages is None else None
 
-    # Recorre páginas (o limita por max_pages/max_rows si se indican)
-    while True:
-        page_rows = read_page_rows()
-        for r in page_rows:
-            ws.append(r)
-            rows_written += 1
-            if isinstance(max_rows, int) and max_rows > 0 and rows_written >= max_rows:
-                wb.save(output_xlsx)
-                return
+    try:
+        pages_done = 0
+        rows_written = 0
+        # Solo se espera el AJAX si la tabla es server-side; y si el "Next" no dispara uno
+        # reconocible, dejamos de esperarlo en las páginas siguientes.
+        expect_xhr = _is_server_side_datatable(scope, table_selector)
+
+        # Recorre páginas (o limita por max_pages/max_rows si se indican)
+        while True:
+            page_rows = read_page_rows()
+            for r in page_rows:
+                ws.append(r)
+                rows_written += 1
+                if isinstance(max_rows, int) and max_rows > 0 and rows_written >= max_rows:
+                    wb.save(output_xlsx)
+                    return
 
-        pages_done += 1
-        if isinstance(max_pages, int) and max_pages > 0 and pages_done >= max_pages:
-            break
+            pages_done += 1
+            if isinstance(max_pages, int) and max_pages > 0 and pages_done >= max_pages:
+                break
 
-        if not is_next_enabled():
-            break
+            if not is_next_enabled():
+                break
 
-        old = page_marker()
-        click_next()
-        wait_page_changed(old)
+            old = page_marker()
+            if expect_xhr:
+                expect_xhr = _click_expecting_xhr(table, click_next, "customers", timeout_s=25.0)
+            else:
+                click_next()
+            wait_page_changed(old)
+            _wait_for_datatable_ready(scope, table_selector=table_selector, timeout_s=90.0)
+    finally:
+        # No dejar la tabla del usuario con la página agrandada.
+        _restore_datatable_page(scope, table_selector, prev_page_len)
 
     wb.save(output_xlsx)
 
 
+# Cambia el page length de la DataTable con su propia API (jQuery) y espera el redibujado.
+# Devuelve el page length anterior si lo cambió, null si no (sin DataTables o nada que cambiar).
+# Con `enlarge` solo agranda, y verifica que el servidor haya devuelto la página completa: si la
+# recortó, el "Next" de DataTables avanzaría `len` filas igual y se saltaría las que no llegaron,
+# así que en ese caso restaura el tamaño original y devuelve null.
+_DT_PAGE_LEN_JS = """async ([sel, len, timeoutMs, enlarge]) => {
+    const jq = window.jQuery;
+    if (!jq || !jq.fn || !jq.fn.dataTable || !jq.fn.dataTable.isDataTable(sel)) return null;
+    const api = jq(sel).DataTable();
+    const prev = api.page.len();
+    if (prev === len || (enlarge && (prev < 0 || prev >= len))) return null;
+    const setLen = n => new Promise(resolve => {
+        const timer = setTimeout(resolve, timeoutMs);
+        api.one('draw', () => { clearTimeout(timer); resolve(); });
+        api.page.len(n).draw(false);
+    });
+    await setLen(len);
+    if (enlarge) {
+        const info = api.page.info();
+        const expected = Math.min(len, info.recordsDisplay - info.start);
+        if (api.rows({page: 'current'}).count() < expected) {
+            await setLen(prev);
+            return null;
+        }
+    }
+    return prev;
+}"""
+
+
+# ¿La DataTable pagina del lado del servidor (cada "Next" es un AJAX)?
+_DT_SERVER_SIDE_JS = """sel => {
+    const jq = window.jQuery;
+    if (!jq || !jq.fn || !jq.fn.dataTable || !jq.fn.dataTable.isDataTable(sel)) return false;
+    const settings = jq(sel).DataTable().settings()[0];
+    return !!(settings && settings.oFeatures && settings.oFeatures.bServerSide);
+}"""
+
+
+def _is_server_side_datatable(scope: LocatorScope, table_selector: str) -> bool:
+    css = _plain_css(table_selector)
+    if css is None:
+        return False
+    try:
+        return bool(scope_frame(scope).evaluate(_DT_SERVER_SIDE_JS, css))
+    except Exception:
+        return False
+
+
+def _is_datatables_list_response(response, url_part: str) -> bool:
+    """Respuesta del listado de DataTables: XHR/fetch con `url_part` y el parámetro `draw` que
+    DataTables manda en cada pedido server-side (en la query o en el body del POST).
+
+    Así no cuentan los polls de fondo, contadores o búsquedas de select2 bajo la misma ruta.
+    """
+    request = response.request
+    if request.resource_type not in ("xhr", "fetch") or url_part not in response.url:
+        return False
+    if "draw=" in response.url:
+        return True
+    try:
+        body = request.post_data or ""
+    except Exception:
+        body = ""
+    return "draw" in body
+
+
+def _click_expecting_xhr(table, click, url_part: str, timeout_s: float) -> bool:
+    """Hace click y bloquea hasta la respuesta AJAX del listado de DataTables (ver
+    _is_datatables_list_response).
+
+    Devuelve False si no llegó ninguna respuesta así; los errores del click en sí se propagan.
+    """
+    clicked = False
+    try:
+        with table.page.expect_response(
+            lambda r: _is_datatables_list_response(r, url_part),
+            timeout=timeout_s * 1000,
+        ):
+            click()
+            clicked = True
+    except Exception:
+        if not clicked:
+            raise
+        return False
+    return True
+
+
+def _enlarge_datatable_page(
+    scope: LocatorScope, table_selector: str, length: int = 500, timeout_s: float = 90.0
+) -> int | None:
+    """Menos páginas => menos clicks en "Next" y menos esperas de AJAX + render por página.
+
+    Devuelve el page length original (para _restore_datatable_page) o None si no se cambió;
+    si el servidor no respeta el tamaño pedido, la tabla queda como estaba.
+    """
+    css = _plain_css(table_selector)
+    if css is None:
+        return None
+    try:
+        prev = scope_frame(scope).evaluate(_DT_PAGE_LEN_JS, [css, length, int(timeout_s * 1000), True])
+    except Exception:
+        return None
+    if prev is not None:
+        _wait_for_datatable_ready(scope, table_selector=table_selector, timeout_s=timeout_s)
+    return prev
+
+
+def _restore_datatable_page(
+    scope: LocatorScope, table_selector: str, prev_len: int | None, timeout_s: float = 30.0
+) -> None:
+    """Vuelve la DataTable al page length que tenía antes de la exportación (best-effort)."""
+    css = _plain_css(table_selector)
+    if prev_len is None or css is None:
+        return
+    try:
+        scope_frame(scope).evaluate(_DT_PAGE_LEN_JS, [css, prev_len, int(timeout_s * 1000), False])
+    except Exception:
+        pass
+
+
 def _wait_for_datatable_ready(scope: LocatorScope, table_selector: str, timeout_s: float) -> None:
     table = scope.locator(table_selector).first
     table.wait_for(state="visible")
 
-    start = time.monotonic()
+    sleeper = BackoffSleeper(timeout_s)
+    css = _plain_css(table_selector)
+    if css is not None and _wait_js(scope, _DT_READY_JS, css, timeout_s):
+        return
+
+    # Fallback (engine no-CSS o frame recargado): polling por el tiempo restante.
     while True:
-        if time.monotonic() - start > timeout_s:
+        if sleeper.expired():
             return
 
         # Si existe overlay de "processing", esperar a que desaparezca.
         try:
             proc = scope.locator("css=div.dataTables_processing").first
             if proc.count() > 0 and proc.is_visible():
-                time.sleep(0.25)
+                sleeper.sleep()
                 continue
         except Exception:
             pass
@@ -509,13 +654,15 @@ def _wait_for_datatable_ready(scope: LocatorScope, table_selector: str, timeout_
         except Exception:
             pass
 
-        time.sleep(0.25)
+        sleeper.sleep()
 
 
 def _open_or_create_workbook(path: str) -> Workbook:
     p = Path(path)
     if not p.exists():
-        return Workbook()
+        # Archivo nuevo: no hay pestañas que preservar, así que escribimos en modo streaming
+        # (write_only no crea un objeto Cell por valor y no retiene la hoja en memoria).
+        return Workbook(write_only=True)
 
     try:
         return load_workbook(path)
@@ -533,6 +680,9 @@ def _open_or_create_workbook(path: str) -> Workbook:
 
 
 def _get_fresh_sheet(wb: Workbook, sheet_name: str):
+    if wb.write_only:
+        return wb.create_sheet(title=sheet_name)
+
     if sheet_name in wb.sheetnames:
         ws_old = wb[sheet_name]
         wb.remove(ws_old)
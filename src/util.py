@@ -1,18 +1,21 @@
 from __future__ import annotations
 
+import functools
 import json
 from pathlib import Path
 
 from .splynx_playwright import SplynxConfig
 
 
+@functools.lru_cache(maxsize=1)
 def load_config() -> SplynxConfig:
     root = Path(__file__).resolve().parents[1]
     cfg_path = root / "config.json"
     if not cfg_path.exists():
         cfg_path = root / "config.example.json"
 
-    raw = json.loads(cfg_path.read_text(encoding="utf-8"))
+    # json.loads acepta bytes UTF-8 directamente (sin decodificar a str antes).
+    raw = json.loads(cfg_path.read_bytes())
     return SplynxConfig(
         login_url=str(raw["login_url"]),
         selectors=dict(raw.get("selectors", {})),